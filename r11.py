@@ -1,14 +1,25 @@
 import sys
-from PyQt5.QtWidgets import (QApplication, QMainWindow, QGraphicsView, QGraphicsScene, QGraphicsTextItem,
+import json
+from PyQt5.QtWidgets import (QApplication, QMainWindow, QGraphicsView, QGraphicsScene,
                              QVBoxLayout, QPushButton, QHBoxLayout, QInputDialog, QFileDialog,
                              QMessageBox, QWidget)
-from PyQt5.QtGui import QPen, QBrush, QFont, QPolygonF, QPainterPath
-from PyQt5.QtCore import QRectF, QPointF, Qt
-from PyQt5.QtWidgets import QGraphicsLineItem, QGraphicsItem
+from PyQt5.QtGui import QPen, QBrush, QFont, QFontMetricsF, QPolygonF, QPainterPath, QStaticText, QTransform
+from PyQt5.QtCore import QRectF, QPointF, QSizeF, Qt
+from PyQt5.QtWidgets import QGraphicsItem
 import math
+from functools import lru_cache
 
 
 class StateItem(QGraphicsItem):
+    # Paint resources are fixed, so build them once instead of on every repaint
+    _BRUSH_START_ACCEPT = QBrush(Qt.darkCyan)
+    _BRUSH_START = QBrush(Qt.green)
+    _BRUSH_ACCEPT = QBrush(Qt.cyan)
+    _BRUSH_NORMAL = QBrush(Qt.white)
+    _PEN_SOLID = QPen(Qt.black, 2)
+    _PEN_DOTTED = QPen(Qt.black, 2, Qt.DotLine)
+    _FONT = QFont("Segoe UI", 12)
+
     def __init__(self, name, x, y, click_callback=None, width=70, height=50):
         super().__init__()
         self.setPos(x, y)
@@ -17,52 +28,76 @@ class StateItem(QGraphicsItem):
         self.height = height
         self.click_callback = click_callback  # store callback
         self.setFlags(QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable | QGraphicsItem.ItemSendsGeometryChanges)
+        # Paint output only depends on name/start/accept, so reuse the rendered pixmap while dragging
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
         self.is_accept = False
         self.is_start = False
-        self.transitions = {}  # Store transitions as symbol -> list of target state names
+        # Store transitions as symbol -> target state names; the inner dict is used as an
+        # insertion-ordered set so membership checks are O(1) and a DFA's first target is stable
+        self.transitions = {}
+        self._edges = []  # EdgeItems attached to this state, refreshed when it moves
+
+        # Lay out the name once; paint() only blits the cached glyphs, centered on the item
+        self._static_name = QStaticText(name)
+        self._static_name.setTextFormat(Qt.PlainText)
+        self._static_name.setPerformanceHint(QStaticText.AggressiveCaching)
+        self._static_name.prepare(QTransform(), self._FONT)
+        size = self._static_name.size()
+        self._name_offset = QPointF(-size.width() / 2, -size.height() / 2)
+        self._name_rect = QRectF(self._name_offset, size)
 
     def mousePressEvent(self, event):
         if self.click_callback:
             self.click_callback(self)  # notify parent window
         super().mousePressEvent(event)  # keep default behavior (dragging, selecting)
 
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionChange and self.scene():
+            # The scene rect is explicit and doesn't follow drags, so keep the state inside it
+            bounds = self.scene().sceneRect()
+            x = min(max(value.x(), bounds.left() + self.width / 2), bounds.right() - self.width / 2)
+            y = min(max(value.y(), bounds.top() + self.height / 2), bounds.bottom() - self.height / 2)
+            return QPointF(x, y)
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            for edge in self._edges:
+                edge.update_endpoints()
+        return super().itemChange(change, value)
+
     def boundingRect(self):
         margin = 5
-        return QRectF(-self.width / 2 - margin, -self.height / 2 - margin, self.width + 2 * margin, self.height + 2 * margin)
+        rect = QRectF(-self.width / 2 - margin, -self.height / 2 - margin, self.width + 2 * margin, self.height + 2 * margin)
+        # Long names overflow the box; include them so the cached pixmap isn't cut off
+        return rect.united(self._name_rect)
 
     def paint(self, painter, option, widget=None):
         rect = QRectF(-self.width / 2, -self.height / 2, self.width, self.height)
 
         # Fill color based on state type
         if self.is_start and self.is_accept:
-            brush = QBrush(Qt.darkCyan)
+            brush = self._BRUSH_START_ACCEPT
         elif self.is_start:
-            brush = QBrush(Qt.green)
+            brush = self._BRUSH_START
         elif self.is_accept:
-            brush = QBrush(Qt.cyan)
+            brush = self._BRUSH_ACCEPT
         else:
-            brush = QBrush(Qt.white)
+            brush = self._BRUSH_NORMAL
 
         painter.setBrush(brush)
-        pen = QPen(Qt.black, 2)
-        painter.setPen(pen)
+        painter.setPen(self._PEN_SOLID)
 
         # Draw rounded rectangle
         painter.drawRoundedRect(rect, 15, 15)
 
         # Draw double border if accept state
         if self.is_accept:
-            pen2 = QPen(Qt.black, 2)
-            pen2.setStyle(Qt.DotLine)
-            painter.setPen(pen2)
+            painter.setPen(self._PEN_DOTTED)
             inner_rect = rect.adjusted(6, 6, -6, -6)
             painter.drawRoundedRect(inner_rect, 15, 15)
 
         # Draw state name text centered
-        font = QFont("Segoe UI", 12)
-        painter.setFont(font)
+        painter.setFont(self._FONT)
         painter.setPen(Qt.black)
-        painter.drawText(rect, Qt.AlignCenter, self.name)
+        painter.drawStaticText(self._name_offset, self._static_name)
 
     def set_start(self, is_start=True):
         self.is_start = is_start
@@ -91,30 +126,152 @@ class StateItem(QGraphicsItem):
         if dx == 0 and dy == 0:
             return center
 
-        angle = math.atan2(dy, dx)
-
         w = self.width / 2
         h = self.height / 2
 
-        cos_a = math.cos(angle)
-        sin_a = math.sin(angle)
-        denom = math.sqrt((cos_a ** 2) / (w ** 2) + (sin_a ** 2) / (h ** 2))
-        x = (cos_a / denom)
-        y = (sin_a / denom)
+        # Intersect the ray (dx, dy) with the ellipse directly, no trig needed
+        denom = math.sqrt((dx * dx) / (w * w) + (dy * dy) / (h * h))
+        x = dx / denom
+        y = dy / denom
 
         point_on_border = QPointF(center.x() + x, center.y() + y)
         return point_on_border
 
 
+class EdgeItem(QGraphicsItem):
+    _PEN_LINE = QPen(Qt.black, 2)
+    _PEN_HEAD = QPen(Qt.black)
+    _BRUSH_HEAD = QBrush(Qt.black)
+
+    def __init__(self, from_state, to_state, symbol, arrow_size=10):
+        super().__init__()
+        self.from_state = from_state
+        self.to_state = to_state
+        self.symbol = symbol
+        self.arrow_size = arrow_size
+        self.label_font = QFont()  # app default font; needs the QApplication to exist
+        metrics = QFontMetricsF(self.label_font)
+        self._label_size = QSizeF(metrics.boundingRect(self.symbol).width(), metrics.height())
+        self._recompute()
+        from_state._edges.append(self)
+        if to_state is not from_state:
+            to_state._edges.append(self)
+
+    def update_endpoints(self):
+        """Follow the states after one of them moved."""
+        self.prepareGeometryChange()
+        self._recompute()
+
+    def _recompute(self):
+        """
+        Recalculate line endpoints, arrowhead and label position from the
+        current positions of both states.
+        """
+        start = self.from_state.get_border_point_towards(self.to_state.scenePos())
+        end = self.to_state.get_border_point_towards(self.from_state.scenePos())
+        self.start = start
+        self.end = end
+
+        angle = math.atan2(end.y() - start.y(), end.x() - start.x())
+        p1 = QPointF(
+            end.x() - self.arrow_size * math.cos(angle - math.pi / 6),
+            end.y() - self.arrow_size * math.sin(angle - math.pi / 6)
+        )
+        p2 = QPointF(
+            end.x() - self.arrow_size * math.cos(angle + math.pi / 6),
+            end.y() - self.arrow_size * math.sin(angle + math.pi / 6)
+        )
+        self.arrow_head = QPolygonF([end, p1, p2])
+
+        mid_x = (start.x() + end.x()) / 2
+        mid_y = (start.y() + end.y()) / 2
+        self.label_rect = QRectF(QPointF(mid_x + 5, mid_y + 5), self._label_size)
+
+        margin = self.arrow_size
+        line_rect = QRectF(start, end).normalized().adjusted(-margin, -margin, margin, margin)
+        self._bounding_rect = line_rect.united(self.label_rect)
+
+    def boundingRect(self):
+        return self._bounding_rect
+
+    def paint(self, painter, option, widget=None):
+        painter.setPen(self._PEN_LINE)
+        painter.drawLine(self.start, self.end)
+
+        painter.setPen(self._PEN_HEAD)
+        painter.setBrush(self._BRUSH_HEAD)
+        painter.drawPolygon(self.arrow_head)
+
+        painter.setFont(self.label_font)
+        painter.drawText(self.label_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextDontClip, self.symbol)
+
+
+class _RefinablePartition:
+    """
+    Refinable partition of the integers 0..n-1, after Valmari's "Fast brief
+    practical DFA minimization" (2012). The members of each set are stored
+    contiguously in elements[first[s]:past[s]]; marked members are moved to
+    the front of their set, up to mid[s].
+    """
+
+    def __init__(self, n):
+        self.elements = list(range(n))
+        self.location = list(range(n))
+        self.set_of = [0] * n
+        self.first = [0] if n else []
+        self.past = [n] if n else []
+        self.mid = [0] if n else []
+        self.touched = []
+
+    def mark(self, e):
+        s = self.set_of[e]
+        i = self.location[e]
+        j = self.mid[s]
+        self.elements[i] = self.elements[j]
+        self.location[self.elements[i]] = i
+        self.elements[j] = e
+        self.location[e] = j
+        if j == self.first[s]:
+            self.touched.append(s)
+        self.mid[s] = j + 1
+
+    def split(self):
+        # Split every touched set into its marked and unmarked parts; the smaller part gets a new id
+        while self.touched:
+            s = self.touched.pop()
+            j = self.mid[s]
+            if j == self.past[s]:
+                self.mid[s] = self.first[s]
+                continue
+            z = len(self.first)
+            if j - self.first[s] <= self.past[s] - j:
+                self.first.append(self.first[s])
+                self.past.append(j)
+                self.first[s] = j
+            else:
+                self.past.append(self.past[s])
+                self.first.append(j)
+                self.past[s] = j
+            self.mid.append(self.first[z])
+            self.mid[s] = self.first[s]
+            for i in range(self.first[z], self.past[z]):
+                self.set_of[self.elements[i]] = z
+
+
 class Automaton:
     def __init__(self, is_dfa=True):
         self.states = {}
         self.start_state = None
         self.accept_states = set()
         self.is_dfa = is_dfa
+        self._compiled = False
+        # Results are cached per (version, input); any edit bumps the version
+        self._version = 0
+        self._simulate_cached = lru_cache(maxsize=1024)(self._simulate_at_version)
 
     def add_state(self, state):
         self.states[state.name] = state
+        self._invalidate()
 
     def set_start(self, state):
         # Clear previous start state if any
@@ -125,39 +282,287 @@ class Automaton:
 
         self.start_state = state.name
         state.set_start(True)
+        self._invalidate()
 
     def set_accept(self, state):
         state.set_accept(True)
         self.accept_states.add(state.name)
+        self._invalidate()
 
     def add_transition(self, from_state, symbol, to_state):
-        trans = from_state.transitions
-        if symbol not in trans:
-            trans[symbol] = []
-        if to_state.name not in trans[symbol]:
-            trans[symbol].append(to_state.name)
+        from_state.transitions.setdefault(symbol, {})[to_state.name] = None
+        self._invalidate()
+
+    def _invalidate(self):
+        self._compiled = False
+        self._version += 1
+
+    def clear_cache(self):
+        self._simulate_cached.cache_clear()
+
+    def _compile(self):
+        """
+        Flatten states and transitions into integer ids and a dense DFA table
+        so simulate() only does list indexing per input symbol.
+        """
+        names = list(self.states)
+        self._state_idx = {name: i for i, name in enumerate(names)}
+        self._alphabet = sorted({symbol for s in self.states.values() for symbol in s.transitions})
+        self._sym_idx = {symbol: i for i, symbol in enumerate(self._alphabet)}
+
+        # Row-major table: entry state_id * len(alphabet) + symbol_id, -1 for no transition
+        width = len(self._alphabet)
+        table = [-1] * (len(names) * width)
+        for name, state in self.states.items():
+            row = self._state_idx[name] * width
+            for symbol, targets in state.transitions.items():
+                if targets:
+                    table[row + self._sym_idx[symbol]] = self._state_idx[next(iter(targets))]
+        self._dfa_table = table
+        self._n_states = len(names)
+
+        # NFA successors as bitmasks: bit t of succ[state_id][symbol_id] is set for each target t
+        succ = [[0] * width for _ in names]
+        for name, state in self.states.items():
+            row = succ[self._state_idx[name]]
+            for symbol, targets in state.transitions.items():
+                mask = 0
+                for target in targets:
+                    mask |= 1 << self._state_idx[target]
+                row[self._sym_idx[symbol]] = mask
+        self._nfa_succ = succ
+
+        self._start_id = self._state_idx.get(self.start_state, -1)
+        self._accept_ids = {self._state_idx[name] for name in self.accept_states if name in self._state_idx}
+        self._accept_mask = 0
+        for state_id in self._accept_ids:
+            self._accept_mask |= 1 << state_id
+        self._build_flat_table()
+        self._compiled = True
+
+    def _build_flat_table(self):
+        # Byte-level table for the common case of single-character latin-1 symbols:
+        # entry state_id * 256 + ord(char) holds the target's row offset (target_id * 256),
+        # -1 marks the dead state. Storing offsets keeps the hot loop to one add and one index.
+        if not all(len(symbol) == 1 and ord(symbol) < 256 for symbol in self._alphabet):
+            self._flat = None
+            return
+        width = len(self._alphabet)
+        table = self._dfa_table
+        flat = [-1] * (256 * self._n_states)
+        for state_id in range(self._n_states):
+            row = state_id * width
+            for symbol_id, symbol in enumerate(self._alphabet):
+                target = table[row + symbol_id]
+                if target >= 0:
+                    flat[state_id * 256 + ord(symbol)] = target * 256
+        self._flat = flat
+
+    def minimize(self):
+        """
+        Replace the compiled DFA table with the minimal equivalent DFA using
+        Valmari and Lehtinen's partition refinement, which works directly on
+        partial DFAs. States that are unreachable or cannot reach an accept
+        state are dropped. Only the compiled tables change; the StateItems in
+        self.states are left untouched. Does nothing for an NFA, whose tables
+        share the state ids this would renumber.
+        """
+        if not self.is_dfa:
+            return
+        if not self._compiled:
+            self._compile()
+        if self._start_id < 0:
+            return
+        n = self._n_states
+        width = len(self._alphabet)
+        table = self._dfa_table
+
+        # Transitions as parallel arrays of tails, labels and heads
+        tails, labels, heads = [], [], []
+        for state_id in range(n):
+            row = state_id * width
+            for symbol_id in range(width):
+                target = table[row + symbol_id]
+                if target >= 0:
+                    tails.append(state_id)
+                    labels.append(symbol_id)
+                    heads.append(target)
+
+        blocks = _RefinablePartition(n)
+        reached = 0
+
+        def reach(state_id):
+            nonlocal reached
+            i = blocks.location[state_id]
+            if i >= reached:
+                elements = blocks.elements
+                elements[i] = elements[reached]
+                blocks.location[elements[i]] = i
+                elements[reached] = state_id
+                blocks.location[state_id] = reached
+                reached += 1
+
+        def adjacent(keys):
+            # Transitions grouped by key state: those of q are adj[offsets[q]:offsets[q + 1]]
+            offsets = [0] * (n + 1)
+            for key in keys:
+                offsets[key + 1] += 1
+            for q in range(n):
+                offsets[q + 1] += offsets[q]
+            adj = [0] * len(keys)
+            fill = offsets[:]
+            for t, key in enumerate(keys):
+                adj[fill[key]] = t
+                fill[key] += 1
+            return offsets, adj
+
+        def remove_unreachable(sources, targets):
+            nonlocal reached, tails, labels, heads
+            offsets, adj = adjacent(sources)
+            i = 0
+            while i < reached:
+                state_id = blocks.elements[i]
+                for j in range(offsets[state_id], offsets[state_id + 1]):
+                    reach(targets[adj[j]])
+                i += 1
+            keep = [t for t, source in enumerate(sources) if blocks.location[source] < reached]
+            tails = [tails[t] for t in keep]
+            labels = [labels[t] for t in keep]
+            heads = [heads[t] for t in keep]
+            blocks.past[0] = reached
+            reached = 0
+
+        # Keep states reachable from the start that can also reach an accept state
+        reach(self._start_id)
+        remove_unreachable(tails, heads)
+        for state_id in self._accept_ids:
+            if blocks.location[state_id] < blocks.past[0]:
+                reach(state_id)
+        final_count = reached
+        remove_unreachable(heads, tails)
+
+        if blocks.location[self._start_id] >= blocks.past[0]:
+            # Nothing accepting is reachable, so the language is empty
+            self._dfa_table = []
+            self._n_states = 0
+            self._start_id = -1
+            self._accept_ids = set()
+            self._build_flat_table()
+            return
+
+        # Initial partition: accept states (placed first by reach) vs the rest
+        if final_count:
+            blocks.mid[0] = final_count
+            blocks.touched.append(0)
+            blocks.split()
+
+        # Transition partition: one cord per label
+        m = len(tails)
+        cords = _RefinablePartition(m)
+        if m:
+            cords.elements.sort(key=labels.__getitem__)
+            cords.first, cords.past = [0], []
+            label = labels[cords.elements[0]]
+            for i, t in enumerate(cords.elements):
+                if labels[t] != label:
+                    label = labels[t]
+                    cords.past.append(i)
+                    cords.first.append(i)
+                cords.set_of[t] = len(cords.first) - 1
+                cords.location[t] = i
+            cords.past.append(m)
+            cords.mid = cords.first[:]
+
+        # Split blocks by cords and cords by blocks until both are stable
+        offsets, adj = adjacent(heads)
+        b, c = 1, 0
+        while c < len(cords.first):
+            for i in range(cords.first[c], cords.past[c]):
+                blocks.mark(tails[cords.elements[i]])
+            blocks.split()
+            c += 1
+            while b < len(blocks.first):
+                for i in range(blocks.first[b], blocks.past[b]):
+                    state_id = blocks.elements[i]
+                    for j in range(offsets[state_id], offsets[state_id + 1]):
+                        cords.mark(adj[j])
+                cords.split()
+                b += 1
+
+        block_count = len(blocks.first)
+        set_of = blocks.set_of
+        min_table = [-1] * (block_count * width)
+        for t in range(m):
+            min_table[set_of[tails[t]] * width + labels[t]] = set_of[heads[t]]
+
+        self._dfa_table = min_table
+        self._n_states = block_count
+        self._start_id = set_of[self._start_id]
+        self._accept_ids = {b for b in range(block_count) if blocks.first[b] < final_count}
+        self._build_flat_table()
 
     def simulate(self, input_str):
+        return self._simulate_cached(self._version, input_str)
+
+    def _simulate_at_version(self, version, input_str):
+        # version is only part of the cache key
+        return self._simulate_impl(input_str)
+
+    def _simulate_impl(self, input_str):
         if not self.start_state:
             return False
+        if not self._compiled:
+            self._compile()
+            if self.is_dfa:
+                self.minimize()
         if self.is_dfa:
-            current = self.start_state
+            current = self._start_id
+            if current < 0:
+                return False
+            flat = self._flat
+            if flat is not None:
+                try:
+                    data = input_str.encode("latin-1")
+                except UnicodeEncodeError:
+                    return False  # contains a character that can't be in the alphabet
+                current <<= 8
+                for byte in data:
+                    current = flat[current + byte]
+                    if current < 0:
+                        return False
+                return (current >> 8) in self._accept_ids
+            table = self._dfa_table
+            symbol_of = self._sym_idx.get
+            width = len(self._alphabet)
             for char in input_str:
-                state = self.states.get(current)
-                if not state or char not in state.transitions:
+                symbol_id = symbol_of(char)
+                if symbol_id is None:
+                    return False
+                current = table[current * width + symbol_id]
+                if current < 0:
                     return False
-                current = state.transitions[char][0]
-            return current in self.accept_states
+            return current in self._accept_ids
         else:
-            current_states = set([self.start_state])
+            if self._start_id < 0:
+                return False
+            # The current state set is a bitmask; walk its set bits lowest first
+            current = 1 << self._start_id
+            succ = self._nfa_succ
+            symbol_of = self._sym_idx.get
             for char in input_str:
-                next_states = set()
-                for state_name in current_states:
-                    state = self.states[state_name]
-                    if char in state.transitions:
-                        next_states.update(state.transitions[char])
-                current_states = next_states
-            return any(s in self.accept_states for s in current_states)
+                symbol_id = symbol_of(char)
+                if symbol_id is None:
+                    return False
+                next_states = 0
+                remaining = current
+                while remaining:
+                    low_bit = remaining & -remaining
+                    next_states |= succ[low_bit.bit_length() - 1][symbol_id]
+                    remaining ^= low_bit
+                if not next_states:
+                    return False
+                current = next_states
+            return bool(current & self._accept_mask)
 
 
 class AutomataWindow(QMainWindow):
@@ -168,7 +573,16 @@ class AutomataWindow(QMainWindow):
         self.automaton = Automaton(is_dfa=True)
         self.selected_state = None
         self.scene = QGraphicsScene()
+        # States are dragged constantly, so skip the BSP index updates on every move
+        self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        # Explicit bounds so dragging items never grows and invalidates the scene rect;
+        # it is only enlarged via fit_scene_rect when states are placed beyond it
+        self.scene.setSceneRect(0, 0, 4000, 3000)
         self.view = QGraphicsView(self.scene)
+        self.view.centerOn(0, 0)  # new states are placed near the top-left corner of the scene
+        self.view.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
+        # Items set their own pen/brush/font, so the view doesn't need to save painter state
+        self.view.setOptimizationFlags(QGraphicsView.DontSavePainterState | QGraphicsView.DontAdjustForAntialiasing)
         self.init_ui()
 
     def init_ui(self):
@@ -222,6 +636,17 @@ class AutomataWindow(QMainWindow):
             state = StateItem(name, x, y, click_callback=self.on_state_clicked)
             self.scene.addItem(state)
             self.automaton.add_state(state)
+            self.fit_scene_rect(state.sceneBoundingRect())
+
+    def fit_scene_rect(self, rect, margin=50):
+        """Grow the scene rect so rect (plus a margin) stays reachable by scrolling."""
+        if rect.isNull():
+            return
+        grown = rect.adjusted(-margin, -margin, margin, margin)
+        # States never leave the scene rect, so growing right/down is all that's needed
+        grown.setLeft(max(grown.left(), 0))
+        grown.setTop(max(grown.top(), 0))
+        self.scene.setSceneRect(self.scene.sceneRect().united(grown))
 
     def on_state_clicked(self, state):
         self.selected_state = state
@@ -269,76 +694,72 @@ class AutomataWindow(QMainWindow):
         path, _ = QFileDialog.getSaveFileName(self, "Save Automaton", "", "JSON Files (*.json)")
         if not path:
             return
+        # States and symbols are listed once; edges refer to them by index
+        states = self.automaton.states
+        state_idx = {name: i for i, name in enumerate(states)}
+        symbols = sorted({symbol for s in states.values() for symbol in s.transitions})
+        sym_idx = {symbol: i for i, symbol in enumerate(symbols)}
         data = {
-            "states": list(self.automaton.states.keys()),
-            "start": self.automaton.start_state,
-            "accept": list(self.automaton.accept_states),
-            "transitions": {s.name: s.transitions for s in self.automaton.states.values()}
+            "states": list(states),
+            "symbols": symbols,
+            "edges": [[state_idx[s.name], sym_idx[symbol], state_idx[target]]
+                      for s in states.values()
+                      for symbol, targets in s.transitions.items()
+                      for target in targets],
+            "start": state_idx.get(self.automaton.start_state),
+            "accept": [state_idx[name] for name in self.automaton.accept_states],
         }
         with open(path, 'w') as f:
-            import json
-            json.dump(data, f)
+            json.dump(data, f, separators=(",", ":"))
 
     def load_automaton(self):
         path, _ = QFileDialog.getOpenFileName(self, "Load Automaton", "", "JSON Files (*.json)")
         if not path:
             return
         with open(path, 'r') as f:
-            import json
             data = json.load(f)
-        self.scene.clear()
-        self.automaton = Automaton(is_dfa=True)
-        for i, name in enumerate(data["states"]):
-            x, y = i * 100 + 50, 150
-            state = StateItem(name, x, y, click_callback=self.on_state_clicked)
-            self.scene.addItem(state)
-            self.automaton.add_state(state)
-        if data["start"]:
-            self.automaton.set_start(self.automaton.states[data["start"]])
-        for name in data["accept"]:
-            self.automaton.set_accept(self.automaton.states[name])
-        for from_state, trans in data["transitions"].items():
-            from_obj = self.automaton.states.get(from_state)
-            if not from_obj:
-                continue
-            for symbol, to_list in trans.items():
-                for to_name in to_list:
-                    to_obj = self.automaton.states.get(to_name)
-                    if not to_obj:
-                        continue
-                    self.automaton.add_transition(from_obj, symbol, to_obj)
-                    self.draw_arrow(from_obj, to_obj, symbol)
+        names = data["states"]
+        if "edges" in data:
+            symbols = data["symbols"]
+            start = names[data["start"]] if data["start"] is not None else None
+            accept = [names[i] for i in data["accept"]]
+            edges = [(names[src], symbols[sym], names[dst]) for src, sym, dst in data["edges"]]
+        else:
+            # Older files store name-keyed nested transitions
+            start = data["start"]
+            accept = data["accept"]
+            edges = [(from_name, symbol, to_name)
+                     for from_name, trans in data["transitions"].items()
+                     for symbol, to_list in trans.items()
+                     for to_name in to_list]
+        # Repaint once after all items are in the scene instead of after every addItem.
+        # The scene already uses NoIndex, so inserts don't touch a BSP tree either.
+        self.view.setUpdatesEnabled(False)
+        try:
+            self.scene.clear()
+            self.automaton = Automaton(is_dfa=True)
+            for i, name in enumerate(names):
+                x, y = i * 100 + 50, 150
+                state = StateItem(name, x, y, click_callback=self.on_state_clicked)
+                self.scene.addItem(state)
+                self.automaton.add_state(state)
+            self.fit_scene_rect(self.scene.itemsBoundingRect())
+            if start:
+                self.automaton.set_start(self.automaton.states[start])
+            for name in accept:
+                self.automaton.set_accept(self.automaton.states[name])
+            for from_name, symbol, to_name in edges:
+                from_obj = self.automaton.states.get(from_name)
+                to_obj = self.automaton.states.get(to_name)
+                if not from_obj or not to_obj:
+                    continue
+                self.automaton.add_transition(from_obj, symbol, to_obj)
+                self.draw_arrow(from_obj, to_obj, symbol)
+        finally:
+            self.view.setUpdatesEnabled(True)
 
     def draw_arrow(self, from_state, to_state, symbol):
-        start = from_state.get_border_point_towards(to_state.scenePos())
-        end = to_state.get_border_point_towards(from_state.scenePos())
-
-        line = QGraphicsLineItem(start.x(), start.y(), end.x(), end.y())
-        line.setPen(QPen(Qt.black, 2))
-        self.scene.addItem(line)
-
-        self.draw_arrowhead(start, end)
-
-        mid_x = (start.x() + end.x()) / 2
-        mid_y = (start.y() + end.y()) / 2
-        text = QGraphicsTextItem(symbol)
-        text.setPos(mid_x + 5, mid_y + 5)
-        self.scene.addItem(text)
-
-    def draw_arrowhead(self, start, end):
-        arrow_size = 10
-        angle = math.atan2(end.y() - start.y(), end.x() - start.x())
-
-        p1 = QPointF(
-            end.x() - arrow_size * math.cos(angle - math.pi / 6),
-            end.y() - arrow_size * math.sin(angle - math.pi / 6)
-        )
-        p2 = QPointF(
-            end.x() - arrow_size * math.cos(angle + math.pi / 6),
-            end.y() - arrow_size * math.sin(angle + math.pi / 6)
-        )
-        arrow_head = QPolygonF([end, p1, p2])
-        self.scene.addPolygon(arrow_head, QPen(Qt.black), QBrush(Qt.black))
+        self.scene.addItem(EdgeItem(from_state, to_state, symbol))
 
 
 if __name__ == "__main__":